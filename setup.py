@@ -4,7 +4,8 @@ tensorflow = ["tensorflow>=2.6, <2.16.0"]
 pytorch = ["torch>=1.11", "torchdata"]
 sklearn = ["scikit-learn>=1.0"]
 cloud = ["tiledb-cloud"]
-full = sorted({"torchvision", *tensorflow, *pytorch, *sklearn, *cloud})
+numba = ["numba"]
+full = sorted({"torchvision", *tensorflow, *pytorch, *sklearn, *cloud, *numba})
 
 setuptools.setup(
     setup_requires=["setuptools_scm"],
@@ -19,6 +20,7 @@ setuptools.setup(
         "pytorch": pytorch,
         "sklearn": sklearn,
         "cloud": cloud,
+        "numba": numba,
         "full": full,
     },
 )
@@ -1,4 +1,5 @@
 """Tests for TileDB integration with PyTorch Data API."""
+import os
 from operator import methodcaller
 
 import numpy as np
@@ -6,7 +7,9 @@ import pytest
 import torch
 import torchdata
 
+import tiledb
 from tiledb.ml.readers.pytorch import PyTorchTileDBDataLoader, TensorKind
+from tiledb.ml.readers.types import ArrayParams
 
 from .utils import (
     ArraySpec,
@@ -141,3 +144,73 @@ class TestPyTorchTileDBDataLoader:
             assert_tensors_almost_equal_array(
                 batches, data, params.tensor_schema.kind, batch_size, to_dense
             )
+
+    @pytest.mark.parametrize("key_dim", [0, 1])
+    @pytest.mark.parametrize("num_arrays", [1, 2])
+    @pytest.mark.parametrize("drop_last", [False, True])
+    def test_batches_straddling_partitions(
+        self, tmpdir, key_dim, num_arrays, drop_last
+    ):
+        """Test dense batches that straddle the partitions read from the array."""
+        num_rows, batch_size = 50, 3
+        all_params, all_data = [], []
+        for i in range(num_arrays):
+            data = {
+                "af8": np.random.rand(num_rows, 3),
+                "ai2": np.random.randint(100, size=(num_rows, 3), dtype=np.int16),
+            }
+            uri = _create_dense_array(os.path.join(tmpdir, str(i)), data, key_dim)
+            array = tiledb.open(uri)
+            # 8 bytes per cell * (4 * 3) cells per tile = 96 bytes per 4 rows,
+            # so each partition has 8 rows, which is not a multiple of batch_size
+            all_params.append(ArrayParams(array, key_dim, buffer_bytes=192))
+            all_data.append(data)
+        try:
+            assert all(p.tensor_schema.max_partition_weight == 8 for p in all_params)
+            dataloader = PyTorchTileDBDataLoader(
+                *all_params, batch_size=batch_size, drop_last=drop_last
+            )
+            batches = list(dataloader)
+        finally:
+            for params in all_params:
+                params.array.close()
+
+        expected_num_batches = num_rows // batch_size + (not drop_last)
+        assert len(batches) == expected_num_batches
+        for i, batch in enumerate(batches):
+            if num_arrays == 1:
+                batch = (batch,)
+            for tensors, data in zip(batch, all_data):
+                for tensor, field in zip(tensors, ("af8", "ai2")):
+                    assert tensor.is_contiguous()
+                    expected = data[field][i * batch_size : (i + 1) * batch_size]
+                    np.testing.assert_array_equal(tensor, expected)
+
+    @pytest.mark.parametrize("batch_size", [0, -1, 2.0, True])
+    def test_invalid_batch_size(self, tmpdir, batch_size):
+        data = {"af8": np.random.rand(10, 3)}
+        uri = _create_dense_array(os.path.join(tmpdir, "array"), data, key_dim=0)
+        with tiledb.open(uri) as array:
+            with pytest.raises(ValueError) as ex:
+                PyTorchTileDBDataLoader(ArrayParams(array), batch_size=batch_size)
+            assert "batch_size should be a positive integer value" in str(ex.value)
+
+
+def _create_dense_array(uri, data, key_dim):
+    """Create a dense 2D array with tile extents 4 (key dimension) and 3."""
+    num_rows, num_cols = next(iter(data.values())).shape
+    dims = [
+        tiledb.Dim(name="rows", domain=(0, num_rows - 1), dtype=np.int32, tile=4),
+        tiledb.Dim(name="cols", domain=(0, num_cols - 1), dtype=np.int32, tile=3),
+    ]
+    if key_dim > 0:
+        dims.reverse()
+        data = {field: values.T for field, values in data.items()}
+    schema = tiledb.ArraySchema(
+        domain=tiledb.Domain(*dims),
+        attrs=[tiledb.Attr(name=f, dtype=v.dtype) for f, v in data.items()],
+    )
+    tiledb.Array.create(uri, schema)
+    with tiledb.open(uri, "w") as array:
+        array[:] = data
+    return uri
@@ -24,6 +24,15 @@ class TestNumpyArrayCollator:
         assert get_tensor_kind(tensor) is pc.TensorKind.DENSE
         np.testing.assert_array_equal(tensor, np.stack(batch))
 
+    def test_collate_dense_shared(self, monkeypatch):
+        monkeypatch.setattr(pc, "get_worker_info", lambda: object())
+        batch = [np.random.rand(2, 5) for _ in range(7)]
+        tensor = pc.NumpyArrayCollator().collate(batch)
+        assert tensor.shape == (7, 2, 5)
+        assert tensor.is_shared()
+        assert get_tensor_kind(tensor) is pc.TensorKind.DENSE
+        np.testing.assert_array_equal(tensor, np.stack(batch))
+
     def test_convert_nested(self):
         value = np.random.rand(10)
         tensor = pc.NumpyArrayCollator(to_nested=True).convert(value)
@@ -1,11 +1,22 @@
 import itertools as it
 import string
+import threading
 
 import numpy as np
 import pytest
+import scipy.sparse
 
 import tiledb
-from tiledb.ml.readers.types import ArrayParams
+from tiledb.ml.readers._tensor_schema import SparseTensorSchema
+from tiledb.ml.readers._tensor_schema import sparse as sparse_module
+from tiledb.ml.readers._tensor_schema.query import coalesce_indices
+from tiledb.ml.readers._tensor_schema.sparse import (
+    csr_coords,
+    csr_matrix_factory,
+    row_major_order,
+)
+from tiledb.ml.readers._tensor_schema.sparse_to_dense import dense_array_factory
+from tiledb.ml.readers.types import ArrayParams, TensorKind
 
 
 @pytest.fixture(scope="module")
@@ -174,3 +185,266 @@ def _test_max_partition_weight(array, fields, key_dim, dim_selectors):
                 with pytest.raises(tiledb.TileDBError) as ex:
                     schema.query[key_range.min : key_ranges[i + 1].min]
                 assert "py.max_incomplete_retries" in str(ex.value)
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_max_partition_weight_buffer_bytes(dense_uri, sparse_uri, sparse):
+    memory_budget = 4096 if sparse else 160_000
+    config = {
+        "sm.mem.total_budget": memory_budget,
+        "py.init_buffer_bytes": memory_budget,
+    }
+    with tiledb.open(sparse_uri if sparse else dense_uri, config=config) as array:
+        max_weight = ArrayParams(array).tensor_schema.max_partition_weight
+        if not sparse:
+            # 4 slices of 123 rows (of 40 float64 cells) fit in the memory budget
+            assert max_weight == 4 * 123
+        assert max_weight > 1
+        # floor(budget / 2 / size) == floor(floor(budget / size) / 2), so halving the
+        # budget exactly halves the (whole) number of slices or cells
+        for buffer_bytes, expected_max_weight in [
+            (memory_budget * 2, max_weight),
+            (memory_budget, max_weight),
+            (memory_budget // 2, max_weight // 2),
+        ]:
+            schema = ArrayParams(array, buffer_bytes=buffer_bytes).tensor_schema
+            assert schema.max_partition_weight == expected_max_weight
+
+
+def test_get_tensor_schema(sparse_uri):
+    class CustomSparseTensorSchema(SparseTensorSchema):
+        pass
+
+    with tiledb.open(sparse_uri) as array:
+        params = ArrayParams(array, fields=["af8"])
+        default_schema = params.tensor_schema
+        assert type(default_schema) is SparseTensorSchema
+        factories = {TensorKind.SPARSE_COO: CustomSparseTensorSchema}
+        schema = params.get_tensor_schema(factories)
+        assert type(schema) is CustomSparseTensorSchema
+        assert schema.kind is TensorKind.SPARSE_COO
+        # factories of other tensor kinds are ignored
+        schema = params.get_tensor_schema({TensorKind.RAGGED: CustomSparseTensorSchema})
+        assert type(schema) is SparseTensorSchema
+        # every schema has its own query kwargs
+        assert schema._query_kwargs is not default_schema._query_kwargs
+        assert params._tensor_schema_kwargs["_query_kwargs"]["dims"] == ()
+
+
+@pytest.mark.parametrize("buffer_bytes", [0, -1])
+def test_invalid_buffer_bytes(dense_uri, buffer_bytes):
+    with tiledb.open(dense_uri) as array:
+        with pytest.raises(ValueError) as ex:
+            ArrayParams(array, buffer_bytes=buffer_bytes)
+        assert "buffer_bytes must be positive" in str(ex.value)
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_too_small_buffer_bytes(dense_uri, sparse_uri, sparse):
+    config = {"sm.mem.total_budget": 160_000, "py.init_buffer_bytes": 160_000}
+    with tiledb.open(sparse_uri if sparse else dense_uri, config=config) as array:
+        # a single slice of 123 rows (of 40 float64 cells) takes 39360 bytes
+        buffer_bytes = 1 if sparse else 39360 - 1
+        schema = ArrayParams(array, buffer_bytes=buffer_bytes).tensor_schema
+        with pytest.raises(ValueError) as ex:
+            schema.max_partition_weight
+        assert f"buffer_bytes={buffer_bytes} is too small" in str(ex.value)
+        if not sparse:
+            assert "requires at least 39360 bytes" in str(ex.value)
+
+
+@pytest.mark.parametrize(
+    "memory_budget,buffer_bytes,prefetch,expected",
+    [
+        (10 * 1024**3, None, True, False),
+        (10 * 1024**3, 100 * 1024**2, True, True),
+        (10 * 1024**3, 100 * 1024**2, False, False),
+        (200 * 1024**2, None, True, True),
+        (200 * 1024**2 + 1, None, True, False),
+    ],
+)
+def test_prefetch(dense_uri, memory_budget, buffer_bytes, prefetch, expected):
+    config = {"sm.mem.total_budget": memory_budget}
+    with tiledb.open(dense_uri, config=config) as array:
+        params = ArrayParams(array, buffer_bytes=buffer_bytes, prefetch=prefetch)
+        assert params.tensor_schema.prefetch is expected
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_query_iter_results(dense_uri, prefetch):
+    with tiledb.open(dense_uri) as array:
+        schema = ArrayParams(array).tensor_schema
+        query = schema.query
+        key_ranges = list(schema.key_range.partition_by_weight(1000))
+        results = list(query.iter_results(key_ranges, prefetch))
+        assert [key_range for key_range, _ in results] == key_ranges
+        for key_range, result in results:
+            expected = query[key_range.min : key_range.max]
+            assert result.keys() == expected.keys()
+            for field, values in result.items():
+                np.testing.assert_array_equal(values, expected[field])
+
+
+@pytest.mark.parametrize("prefetch", [True, False])
+def test_query_iter_results_prefetch(dense_uri, prefetch):
+    with tiledb.open(dense_uri) as array:
+        schema = ArrayParams(array).tensor_schema
+        query = schema.query
+        key_ranges = list(schema.key_range.partition_by_weight(1000))
+        assert len(key_ranges) > 2
+
+        queried = []
+        next_queried = threading.Event()
+        query_key_range = query._query_key_range
+
+        def record_query_key_range(key_range):
+            queried.append(key_range)
+            if len(queried) == 2:
+                next_queried.set()
+            return query_key_range(key_range)
+
+        query._query_key_range = record_query_key_range
+        num_threads = threading.active_count()
+        results = query.iter_results(key_ranges, prefetch)
+        key_range, _ = next(results)
+        assert key_range == key_ranges[0]
+        if prefetch:
+            # the next key range is queried before the current result is consumed
+            assert next_queried.wait(timeout=10)
+            assert queried == key_ranges[:2]
+        else:
+            assert queried == key_ranges[:1]
+
+        # closing the generator early shuts down the background thread without
+        # querying any more key ranges
+        results.close()
+        assert threading.active_count() == num_threads
+        assert queried == key_ranges[: 2 if prefetch else 1]
+
+
+@pytest.mark.parametrize("num_duplicates", [0, 5])
+@pytest.mark.parametrize("shuffle", [False, True])
+def test_csr_matrix_factory(num_duplicates, shuffle):
+    shape = (20, 30)
+    flat_idx = np.random.choice(np.prod(shape), size=50, replace=False)
+    flat_idx.sort()
+    flat_idx = np.concatenate([flat_idx, flat_idx[:num_duplicates]])
+    if shuffle:
+        np.random.shuffle(flat_idx)
+    coords = np.array(np.unravel_index(flat_idx, shape))
+    data = np.random.rand(len(flat_idx))
+
+    csr = csr_matrix_factory(coords, shape)(data)
+    expected = scipy.sparse.csr_matrix((data, coords), shape)
+    assert csr.shape == shape
+    assert csr.indices.dtype == csr.indptr.dtype == np.int32
+    np.testing.assert_array_equal(csr.toarray(), expected.toarray())
+
+    coo_coords = csr_coords(csr)
+    rows, cols = coo_coords
+    np.testing.assert_array_equal(
+        rows * shape[1] + cols, np.sort(rows * shape[1] + cols)
+    )
+
+
+@pytest.mark.parametrize("use_kernel", [True, False])
+def test_csr_coords(monkeypatch, use_kernel):
+    csr = scipy.sparse.random(20, 30, density=0.1, format="csr")
+    if use_kernel:
+        pytest.importorskip("numba")
+        assert sparse_module._fill_csr_coords is not None
+    else:
+        monkeypatch.setattr(
+            "tiledb.ml.readers._tensor_schema.sparse._fill_csr_coords", None
+        )
+    coo = csr.tocoo()
+    np.testing.assert_array_equal(csr_coords(csr), np.array((coo.row, coo.col)))
+
+
+@pytest.mark.parametrize("num_duplicates", [0, 5])
+@pytest.mark.parametrize("sum_duplicates", [False, True])
+def test_dense_array_factory(num_duplicates, sum_duplicates):
+    if num_duplicates and not sum_duplicates:
+        pytest.skip("Duplicate coordinates must be summed")
+    shape = (20, 30, 4)
+    flat_idx = np.random.choice(np.prod(shape), size=50, replace=False)
+    flat_idx = np.concatenate([flat_idx, flat_idx[:num_duplicates]])
+    np.random.shuffle(flat_idx)
+    coords = np.array(np.unravel_index(flat_idx, shape))
+    data = np.random.rand(len(flat_idx))
+
+    dense = dense_array_factory(coords, shape, sum_duplicates)(data)
+    expected = np.zeros(shape)
+    np.add.at(expected, tuple(coords), data)
+    np.testing.assert_array_almost_equal(dense, expected)
+
+
+@pytest.mark.parametrize(
+    "coords,expected_order,expected_unique",
+    [
+        ([[0, 0, 1], [1, 2, 0]], None, True),
+        ([[1, 0, 0], [0, 2, 1]], [2, 1, 0], True),
+        ([[0, 1, 0], [1, 0, 1]], [0, 2, 1], False),
+    ],
+)
+def test_row_major_order(coords, expected_order, expected_unique):
+    order, unique = row_major_order(np.array(coords), (2, 3))
+    if expected_order is None:
+        assert order is None
+    else:
+        np.testing.assert_array_equal(order, expected_order)
+    assert unique is expected_unique
+
+
+@pytest.mark.parametrize(
+    "indices,expected",
+    [
+        ([], []),
+        ([4], [4]),
+        ([1, 2, 3, 7, 9, 10], [slice(1, 3), 7, slice(9, 10)]),
+        ([-2, -1, 0, 1], [slice(-2, 1)]),
+        ([5, 4, 3, 4, 5], [5, 4, slice(3, 5)]),
+        ([1, 1, 2], [1, slice(1, 2)]),
+    ],
+)
+def test_coalesce_indices(indices, expected):
+    assert coalesce_indices(indices) == expected
+
+
+def test_query_non_integer_dim_selector(tmp_path):
+    uri = str(tmp_path / "float_dim")
+    schema = tiledb.ArraySchema(
+        sparse=True,
+        domain=tiledb.Domain(
+            tiledb.Dim(name="key", domain=(0, 9), dtype=np.int32),
+            tiledb.Dim(name="x", domain=(0.0, 10.0), dtype=np.float64),
+        ),
+        attrs=[tiledb.Attr(name="a", dtype=np.int32)],
+    )
+    tiledb.Array.create(uri, schema)
+    keys = np.array([0, 0, 1, 1, 2, 2], dtype=np.int32)
+    xs = np.array([1.0, 1.5, 2.0, 2.7, 3.0, 3.5])
+    with tiledb.open(uri, "w") as array:
+        array[keys, xs] = {"a": np.arange(len(keys), dtype=np.int32)}
+
+    with tiledb.open(uri) as array:
+        params = ArrayParams(
+            array, "key", fields=["a", "x"], dim_selectors={"x": [1, 2, 3]}
+        )
+        schema = params.tensor_schema
+        assert schema.kind is TensorKind.RAGGED
+        # only the cells at the selected points are returned, not the ones between
+        result = schema.query[0:2]
+        np.testing.assert_array_equal(np.sort(result["x"]), [1.0, 2.0, 3.0])
+        np.testing.assert_array_equal(np.sort(result["a"]), [0, 2, 4])
+        assert schema.key_range.weight == 3
+
+
+def test_query_coalesced_selector(dense_uri):
+    d1_selector = [-20, -19, -18, -10, 3, 4, 5, 6, 18]
+    with tiledb.open(dense_uri) as array:
+        schema = ArrayParams(
+            array, "d0", dim_selectors={"d1": d1_selector}
+        ).tensor_schema
+        expected = array.query(attrs=["af8"]).multi_index[100:199, d1_selector]
+        np.testing.assert_array_equal(schema.query[100:199]["af8"], expected["af8"])
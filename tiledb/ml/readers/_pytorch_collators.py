@@ -8,8 +8,10 @@ import numpy as np
 import scipy.sparse
 import sparse
 import torch
+from torch.utils.data import get_worker_info
 
 from ._tensor_schema import TensorSchema
+from ._tensor_schema.sparse import csr_coords
 from .types import TensorKind
 
 try:
@@ -108,8 +110,22 @@ class NumpyArrayCollator(Collator[np.ndarray]):
     def collate(self, batch: Sequence[np.ndarray]) -> torch.Tensor:
         if self.to_nested:
             return nested_tensor(list(map(torch.from_numpy, batch)))
-        else:
+        if get_worker_info() is None:
             return torch.from_numpy(np.stack(batch))
+        # In a DataLoader worker process stack the batch directly into shared memory,
+        # so that the tensor is sent to the main process without being copied
+        tensor = _empty_shared_tensor((len(batch), *batch[0].shape), batch[0].dtype)
+        np.stack(batch, out=tensor.numpy())
+        return tensor
+
+
+def _empty_shared_tensor(shape: Sequence[int], dtype: np.dtype) -> torch.Tensor:
+    """Return an uninitialized tensor of the given shape and dtype in shared memory."""
+    elem = torch.from_numpy(np.empty(0, dtype=dtype))
+    # same approach as torch.utils.data.default_collate
+    get_storage = getattr(elem, "_typed_storage", elem.storage)
+    storage = get_storage()._new_shared(int(np.prod(shape)))
+    return elem.new(storage).resize_(*shape)
 
 
 @dataclass(frozen=True)
@@ -157,9 +173,8 @@ class ScipySparseCSRCollator(Collator[scipy.sparse.csr_matrix]):
                 value.indices.reshape(1, -1), value.data, value.shape[1:]
             )
 
-        coo = value.tocoo()
-        coords = np.stack((coo.row, coo.col))
-        return torch.sparse_coo_tensor(coords, coo.data, coo.shape)
+        coords = torch.from_numpy(csr_coords(value))
+        return torch.sparse_coo_tensor(coords, value.data[: value.nnz], value.shape)
 
     def collate(self, batch: Sequence[scipy.sparse.csr_matrix]) -> torch.Tensor:
         return self.convert(scipy.sparse.vstack(batch), _collating=True)
@@ -24,6 +24,9 @@ from .ranges import InclusiveRange
 
 Tensor = TypeVar("Tensor")
 
+# Maximum memory budget of a partition for prefetching the next partition
+PREFETCH_MAX_BUDGET = 200 * 1024**2
+
 
 @dataclass(frozen=True)
 class TensorSchema(ABC, Generic[Tensor]):
@@ -39,6 +42,8 @@ class TensorSchema(ABC, Generic[Tensor]):
     _ned: Sequence[Tuple[Any, Any]]
     _dim_selectors: Dict[int, Selector]
     _query_kwargs: Dict[str, Any]
+    _buffer_bytes: Optional[int] = None
+    _prefetch: bool = True
 
     @property
     def num_fields(self) -> int:
@@ -107,7 +112,26 @@ class TensorSchema(ABC, Generic[Tensor]):
           It depends on the `sm.mem.total_budget` config parameter.
         - For sparse arrays, it is the number of non-empty cells.
           It depends on the `py.init_buffer_bytes` config parameter.
+
+        In both cases the memory budget is capped by `buffer_bytes` (if given). The
+        budget applies to a single partition: if `prefetch` is true, the next partition
+        is read while the current one is processed, so up to twice the budget may be
+        used.
+        """
+
+    @property
+    @abstractmethod
+    def memory_budget(self) -> int:
+        """Memory budget (in bytes) for reading a partition."""
+
+    @property
+    def prefetch(self) -> bool:
+        """Whether to read the next partition while the current one is processed.
+
+        Prefetching holds up to two partitions in memory, so it is disabled if the
+        memory budget of a partition exceeds `PREFETCH_MAX_BUDGET`.
         """
+        return self._prefetch and self.memory_budget <= PREFETCH_MAX_BUDGET
 
     @abstractmethod
     def iter_tensors(
@@ -124,6 +148,22 @@ class TensorSchema(ABC, Generic[Tensor]):
         :param key_ranges: Inclusive ranges along the key dimension.
         """
 
+    def _get_memory_budget(self, config_key: str, default: Optional[int] = None) -> int:
+        """Get the memory budget (in bytes) for reading a partition.
+
+        :param config_key: Config parameter that determines the memory budget.
+        :param default: Memory budget if `config_key` is not set.
+        """
+        try:
+            memory_budget = int(self._array._ctx_().config()[config_key])
+        except KeyError:
+            if default is None:
+                raise
+            memory_budget = default
+        if self._buffer_bytes is not None:
+            memory_budget = min(memory_budget, self._buffer_bytes)
+        return memory_budget
+
     def _get_query(self, **kwargs: Any) -> KeyDimQuery:
         return KeyDimQuery(
             self._array, self._key_dim_index, self._dim_selectors, **kwargs
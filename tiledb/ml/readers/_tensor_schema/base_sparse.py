@@ -1,10 +1,12 @@
+from abc import abstractmethod
 from math import ceil
-from typing import Any, Counter
+from operator import itemgetter
+from typing import Any, Callable, Counter, Iterable, Sequence, Union, cast
 
 import numpy as np
 
 from .base import Tensor, TensorSchema
-from .ranges import WeightedRange
+from .ranges import InclusiveRange, WeightedRange
 
 
 class BaseSparseTensorSchema(TensorSchema[Tensor]):
@@ -33,12 +35,13 @@ class BaseSparseTensorSchema(TensorSchema[Tensor]):
             self._key_range = WeightedRange.from_mapping(key_counter)
             return self._key_range
 
+    @property
+    def memory_budget(self) -> int:
+        return self._get_memory_budget("py.init_buffer_bytes", default=10 * 1024**2)
+
     @property
     def max_partition_weight(self) -> int:
-        try:
-            memory_budget = int(self._array._ctx_().config()["py.init_buffer_bytes"])
-        except KeyError:
-            memory_budget = 10 * 1024**2
+        memory_budget = self.memory_budget
 
         # Determine the bytes per (non-empty) cell for each field.
         # - For fixed size fields, this is just the `dtype.itemsize` of the field.
@@ -59,4 +62,73 @@ class BaseSparseTensorSchema(TensorSchema[Tensor]):
 
         # Finally, the number of cells that can fit in the memory_budget depends on the
         # maximum bytes_per_cell
-        return max(1, memory_budget // ceil(max(bytes_per_cell)))
+        max_bytes_per_cell = ceil(max(bytes_per_cell))
+        max_weight = max(1, memory_budget // max_bytes_per_cell)
+        if memory_budget == self._buffer_bytes:
+            # buffer_bytes must be large enough for reading the cells of any single key
+            max_key_weight = int(np.max(self.key_range.weights))
+            if max_weight < max_key_weight:
+                raise ValueError(
+                    f"buffer_bytes={self._buffer_bytes} is too small: reading the "
+                    f"cells of a single key requires at least "
+                    f"{max_key_weight * max_bytes_per_cell} bytes"
+                )
+        return max_weight
+
+
+class BaseCOOTensorSchema(BaseSparseTensorSchema[Tensor]):
+    """Abstract base class for mapping the COO cells of sparse TileDB arrays to tensors.
+
+    The coordinates of the cells read for each key range are converted to zero-based
+    integer indices and passed to `_get_tensor_factory` to create the tensors.
+    """
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._query_kwargs["dims"] = self._all_dims
+
+    def iter_tensors(
+        self, key_ranges: Iterable[InclusiveRange[Any, int]]
+    ) -> Union[Iterable[Tensor], Iterable[Sequence[Tensor]]]:
+        non_key_shape = tuple(cast(Sequence[int], self.shape)[1:])
+        ndim = len(non_key_shape) + 1
+        query = self.query
+        get_data = itemgetter(*self._fields)
+        single_field = len(self._fields) == 1
+        key_dim, *non_key_dims = self._all_dims
+        non_key_dim_starts = tuple(map(itemgetter(0), self._ned[1:]))
+        for key_range, field_arrays in query.iter_results(key_ranges, self.prefetch):
+            # The shape of the key dimension is equal to the current key range length
+            shape = (len(key_range), *non_key_shape)
+            data = get_data(field_arrays)
+
+            # Convert coordinates from the original domain to zero-based and write them
+            # to a preallocated array with one row per dimension
+            key_dim_values = field_arrays.pop(key_dim)
+            coords = np.empty((ndim, len(key_dim_values)), dtype=np.int64)
+            # For the key (i.e. first) dimension get the indices of the keys
+            coords[0] = key_range.indices(key_dim_values)
+            # For every non-key dimension, subtract the minimum value of the dimension
+            # directly into the coords array, without a temporary array
+            # TODO: update this for non-integer non-key dimensions
+            for dim_coords, dim, dim_start in zip(
+                coords[1:], non_key_dims, non_key_dim_starts
+            ):
+                np.subtract(field_arrays.pop(dim), dim_start, out=dim_coords)
+
+            # yield either a single tensor or one tensor per field
+            factory = self._get_tensor_factory(coords, shape)
+            if single_field:
+                yield factory(data)
+            else:
+                yield tuple(map(factory, data))
+
+    @abstractmethod
+    def _get_tensor_factory(
+        self, coords: np.ndarray, shape: Sequence[int]
+    ) -> Callable[[np.ndarray], Tensor]:
+        """Return a function for creating tensors with the given coordinates and shape.
+
+        :param coords: Zero-based indices of the cells, one row per dimension.
+        :param shape: Shape of the tensors to create.
+        """
@@ -54,19 +54,25 @@ class DenseTensorSchema(TensorSchema[np.ndarray]):
         this method yields arrays of shape (4, 5, 20).
         """
         query = self.query
-        get_data = itemgetter(*self._fields)
+        fields = self._fields
+        get_data = itemgetter(*fields)
         key_dim_index = self._key_dim_index
-        for key_range in key_ranges:
-            field_arrays = query[key_range.min : key_range.max]
+        for _, field_arrays in query.iter_results(key_ranges, self.prefetch):
             if key_dim_index > 0:
                 # Move key_dim_index axes first
-                for field, array in field_arrays.items():
-                    field_arrays[field] = np.moveaxis(array, key_dim_index, 0)
+                for field in fields:
+                    field_arrays[field] = np.moveaxis(
+                        field_arrays[field], key_dim_index, 0
+                    )
             yield get_data(field_arrays)
 
+    @property
+    def memory_budget(self) -> int:
+        return self._get_memory_budget("sm.mem.total_budget")
+
     @property
     def max_partition_weight(self) -> int:
-        memory_budget = int(self._array._ctx_().config()["sm.mem.total_budget"])
+        memory_budget = self.memory_budget
 
         # The memory budget should be large enough to read the cells of the largest field
         bytes_per_cell = max(dtype.itemsize for dtype in self.field_dtypes)
@@ -108,6 +114,11 @@ class DenseTensorSchema(TensorSchema[np.ndarray]):
 
         # Compute the number of slices that fit within the memory budget
         num_slices = memory_budget // bytes_per_slice
+        if num_slices == 0 and memory_budget == self._buffer_bytes:
+            raise ValueError(
+                f"buffer_bytes={self._buffer_bytes} is too small: reading a slice of "
+                f"{rows_per_slice} rows requires at least {bytes_per_slice} bytes"
+            )
 
         # Compute the total number of rows to slice
         return max(1, int(rows_per_slice * num_slices))
@@ -1,8 +1,24 @@
-from typing import Any, List, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
 
 import tiledb
 
 from ..types import Selector
+from .ranges import InclusiveRange
+
+QuerySelector = Union[slice, Sequence[Union[int, slice]]]
 
 
 class KeyDimQuery:
@@ -14,15 +30,21 @@ class KeyDimQuery:
         **kwargs: Any,
     ):
         self._multi_index = array.query(**kwargs).multi_index
-        selectors: List[Selector] = [slice(None)] * array.ndim
+        selectors: List[QuerySelector] = [slice(None)] * array.ndim
         for i, selector in dim_selectors.items():
             if i == 0:
                 # ignore selector for the key dimension
                 continue
             elif i == key_dim_index:
                 # key_dim_index got swapped with 0th index
-                selectors[0] = selector
+                i = 0
+            if isinstance(selector, slice):
+                selectors[i] = selector
+            elif np.issubdtype(array.dim(i).dtype, np.integer):
+                selectors[i] = coalesce_indices(selector)
             else:
+                # a range of a non-integer dimension would select values between the
+                # given points too, so the points are not coalesced
                 selectors[i] = selector
         self._leading_selectors = tuple(selectors[:key_dim_index])
         self._trailing_selectors = tuple(selectors[key_dim_index + 1 :])
@@ -31,3 +53,58 @@ class KeyDimQuery:
         """Query the TileDB array by `dim_key=key_dim_slice`."""
         selectors = (*self._leading_selectors, key_dim_slice, *self._trailing_selectors)
         return self._multi_index[selectors]
+
+    def iter_results(
+        self, key_ranges: Iterable[InclusiveRange[Any, int]], prefetch: bool = True
+    ) -> Iterator[Tuple[InclusiveRange[Any, int], Any]]:
+        """Query the TileDB array for each of the given key ranges.
+
+        The same TileDB query is used for all key ranges but every result has its own
+        arrays: they are not reused across key ranges because the generated tensors
+        may be views of them.
+
+        :param key_ranges: Inclusive ranges along the key dimension.
+        :param prefetch: If true, the query for the next key range runs in a background
+            thread while the result for the current key range is being consumed, so
+            that reading overlaps with processing. This holds up to two results in
+            memory at the same time.
+        :return: An iterator of `(key_range, result)` tuples.
+        """
+        if not prefetch:
+            yield from map(self._query_key_range, key_ranges)
+            return
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future: Optional[Future[Any]] = None
+            for key_range in key_ranges:
+                next_future = executor.submit(self._query_key_range, key_range)
+                if future is not None:
+                    yield future.result()
+                future = next_future
+            if future is not None:
+                yield future.result()
+
+    def _query_key_range(
+        self, key_range: InclusiveRange[Any, int]
+    ) -> Tuple[InclusiveRange[Any, int], Any]:
+        return key_range, self[key_range.min : key_range.max]
+
+
+def coalesce_indices(indices: Sequence[int]) -> Sequence[Union[int, slice]]:
+    """Coalesce runs of consecutive integers into (inclusive) slices.
+
+    Each item of a multi-index selector is a separate range of the TileDB query, so
+    fewer and larger ranges are cheaper to set up and read. The order of the indices
+    is preserved. For example, `[1, 2, 3, 7, 9, 10]` is coalesced into
+    `[slice(1, 3), 7, slice(9, 10)]`.
+    """
+    values = np.asarray(indices)
+    if values.ndim != 1 or not np.issubdtype(values.dtype, np.integer):
+        return indices
+    # a new run starts wherever the difference from the previous index is not 1
+    run_starts = np.flatnonzero(np.diff(values) != 1) + 1
+    starts = values[np.concatenate(([0], run_starts))].tolist()
+    stops = values[np.concatenate((run_starts - 1, [len(values) - 1]))].tolist()
+    return [
+        start if start == stop else slice(start, stop)
+        for start, stop in zip(starts, stops)
+    ]
@@ -41,16 +41,17 @@ class RaggedTensorSchema(BaseSparseTensorSchema[RaggedArray]):
         self, key_ranges: Iterable[InclusiveRange[int, int]]
     ) -> Union[Iterable[RaggedArray], Iterable[Sequence[RaggedArray]]]:
         query = self.query
-        get_data = itemgetter(*self._fields)
+        fields = self._fields
+        get_data = itemgetter(*fields)
         key_dim = self.key_dim
-        for key_range in key_ranges:
-            field_arrays = query[key_range.min : key_range.max]
+        for _, field_arrays in query.iter_results(key_ranges, self.prefetch):
             # Sort the key dimension values and find the indices where the value changes
             sort_idx = np.argsort(field_arrays[key_dim], kind="stable")
             split_idx = argdiff(field_arrays[key_dim][sort_idx])
-            # apply the same sorting and splitting to all the field arrays
-            for name, values in field_arrays.items():
-                field_arrays[name] = np.split(values[sort_idx], split_idx)
+            # apply the same sorting and splitting to the arrays of the selected fields;
+            # the key dimension may have been queried only for grouping the cells
+            for field in fields:
+                field_arrays[field] = np.split(field_arrays[field][sort_idx], split_idx)
             yield get_data(field_arrays)
 
 
@@ -1,60 +1,128 @@
-from operator import itemgetter
-from typing import Any, Iterable, Sequence, Union, cast
+from functools import lru_cache, partial
+from typing import Callable, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import scipy.sparse
 import sparse
 
-from .base_sparse import BaseSparseTensorSchema
-from .ranges import InclusiveRange
+from .base_sparse import BaseCOOTensorSchema
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = prange = None
 
 SparseArray = Union[scipy.sparse.csr_matrix, sparse.COO]
 
 
-class SparseTensorSchema(BaseSparseTensorSchema[SparseArray]):
+class SparseTensorSchema(BaseCOOTensorSchema[SparseArray]):
     """
     TensorSchema for reading sparse TileDB arrays as SparseArray instances.
     """
 
-    def __init__(self, **kwargs: Any):
-        super().__init__(**kwargs)
-        self._query_kwargs["dims"] = self._all_dims
-
-    def iter_tensors(
-        self, key_ranges: Iterable[InclusiveRange[Any, int]]
-    ) -> Union[Iterable[SparseArray], Iterable[Sequence[SparseArray]]]:
-        shape = list(cast(Sequence[int], self.shape))
-        SparseArrayFactory = csr_matrix if len(shape) == 2 else sparse.COO
-        query = self.query
-        get_data = itemgetter(*self._fields)
-        single_field = len(self._fields) == 1
-        key_dim, *non_key_dims = self._all_dims
-        non_key_dim_starts = tuple(map(itemgetter(0), self._ned[1:]))
-        for key_range in key_ranges:
-            # Set the shape of the key dimension equal to the current key range length
-            shape[0] = len(key_range)
-            field_arrays = query[key_range.min : key_range.max]
-            data = get_data(field_arrays)
-
-            # Convert coordinates from the original domain to zero-based
-            # For the key (i.e. first) dimension get the indices of the keys
-            coords = [key_range.indices(field_arrays.pop(key_dim))]
-            # For every non-key dimension, subtract the minimum value of the dimension
-            # TODO: update this for non-integer non-key dimensions
-            coords.extend(
-                field_arrays.pop(dim) - dim_start
-                for dim, dim_start in zip(non_key_dims, non_key_dim_starts)
-            )
-            coords = np.array(coords)
-
-            # yield either a single SparseArray or one SparseArray per field
-            if single_field:
-                yield SparseArrayFactory(coords, data, shape)
-            else:
-                yield tuple(SparseArrayFactory(coords, d, shape) for d in data)
-
-
-def csr_matrix(
-    coords: np.ndarray, data: np.ndarray, shape: Sequence[int]
-) -> scipy.sparse.csr_matrix:
-    return scipy.sparse.csr_matrix((data, coords), shape)
+    def _get_tensor_factory(
+        self, coords: np.ndarray, shape: Sequence[int]
+    ) -> Callable[[np.ndarray], SparseArray]:
+        if len(shape) != 2:
+            return coo_array_factory(coords, shape)
+        return csr_matrix_factory(coords, shape)
+
+
+def coo_array_factory(
+    coords: np.ndarray, shape: Sequence[int]
+) -> Callable[[np.ndarray], sparse.COO]:
+    """Return a function for creating sparse.COO arrays with the given coordinates."""
+    return partial(sparse.COO, coords, shape=tuple(shape))
+
+
+def csr_matrix_factory(
+    coords: np.ndarray, shape: Sequence[int]
+) -> Callable[[np.ndarray], scipy.sparse.csr_matrix]:
+    """Return a function for creating CSR matrices with the given (row, col) coordinates.
+
+    The coordinates are sorted by row and column (and the `indptr` is computed) just
+    once and all the created matrices share the same `indices` and `indptr` arrays.
+    This is cheaper than the generic COO -> CSR conversion of scipy, which is used only
+    if there are duplicate coordinates whose values have to be summed.
+
+    The `indices` and `indptr` arrays are int32 unless the shape or the number of
+    coordinates requires int64, so that scipy doesn't downcast them for every matrix.
+    """
+    shape = tuple(shape)
+    order, unique = row_major_order(coords, shape)
+    if not unique:
+        return lambda data: scipy.sparse.csr_matrix((data, coords), shape)
+    rows, cols = coords
+    if order is not None:
+        cols = cols[order]
+    int32_max = np.iinfo(np.int32).max
+    index_dtype = np.int32 if max(len(cols), *shape) <= int32_max else np.int64
+    cols = cols.astype(index_dtype, copy=False)
+    indptr = np.zeros(shape[0] + 1, dtype=index_dtype)
+    np.cumsum(np.bincount(rows, minlength=shape[0]), dtype=index_dtype, out=indptr[1:])
+
+    def factory(data: np.ndarray) -> scipy.sparse.csr_matrix:
+        if order is not None:
+            data = data[order]
+        return scipy.sparse.csr_matrix((data, cols, indptr), shape)
+
+    return factory
+
+
+def row_major_order(
+    coords: np.ndarray, shape: Sequence[int]
+) -> Tuple[Optional[np.ndarray], bool]:
+    """Find the permutation that sorts the given coordinates in row-major order.
+
+    :param coords: Zero-based indices of the cells, one row per dimension.
+    :param shape: Shape of the array the coordinates refer to.
+    :return: A `(order, unique)` tuple, where `order` is the sorting permutation (or
+        None if the coordinates are already sorted) and `unique` is false if there are
+        duplicate coordinates.
+    """
+    keys = np.ravel_multi_index(tuple(coords), shape)
+    if np.all(keys[:-1] < keys[1:]):
+        return None, True
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    return order, not np.any(keys[:-1] == keys[1:])
+
+
+def csr_coords(csr: scipy.sparse.csr_matrix) -> np.ndarray:
+    """Return the (row, col) coordinates of the stored values of a CSR matrix.
+
+    The row coordinates are expanded from `csr.indptr` and written along with the column
+    coordinates into a single preallocated `(2, csr.nnz)` array, without converting
+    `csr` to COO. If Numba is installed, the coordinates are filled in by a compiled
+    kernel that runs in parallel over the rows.
+    """
+    nnz = csr.indptr[-1]
+    coords = np.empty((2, nnz), dtype=np.int64)
+    if _fill_csr_coords is not None:
+        _fill_csr_coords(csr.indptr, csr.indices, coords)
+    else:
+        coords[0] = np.repeat(_arange(csr.shape[0]), np.diff(csr.indptr))
+        coords[1] = csr.indices[:nnz]
+    return coords
+
+
+@lru_cache(maxsize=16)
+def _arange(n: int) -> np.ndarray:
+    """Return a cached read-only `np.arange(n)` array."""
+    a = np.arange(n)
+    a.flags.writeable = False
+    return a
+
+
+def _fill_csr_coords_kernel(
+    indptr: np.ndarray, indices: np.ndarray, coords: np.ndarray
+) -> None:
+    for row in prange(len(indptr) - 1):
+        for k in range(indptr[row], indptr[row + 1]):
+            coords[0, k] = row
+            coords[1, k] = indices[k]
+
+
+_fill_csr_coords: Optional[Callable[[np.ndarray, np.ndarray, np.ndarray], None]] = None
+if njit is not None:
+    _fill_csr_coords = njit(parallel=True, cache=True)(_fill_csr_coords_kernel)
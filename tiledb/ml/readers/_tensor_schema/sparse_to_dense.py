@@ -1,28 +1,47 @@
-from functools import singledispatch
-from operator import methodcaller
-from typing import Any
+from typing import Callable, Sequence
 
 import numpy as np
-import scipy.sparse
-import sparse
 
-from .base import TensorSchema
-from .mapped import MappedTensorSchema
-from .sparse import SparseTensorSchema
+from .base_sparse import BaseCOOTensorSchema
+from .sparse import row_major_order
 
 
-def SparseToDenseTensorSchema(**kwargs: Any) -> TensorSchema[np.ndarray]:
+class SparseToDenseTensorSchema(BaseCOOTensorSchema[np.ndarray]):
     """
-    Return a TensorSchema for reading sparse TileDB arrays as (dense) Numpy arrays.
+    TensorSchema for reading sparse TileDB arrays as (dense) Numpy arrays.
+
+    The cells of each key range are scattered directly into a zero-filled Numpy array,
+    without creating an intermediate sparse array.
     """
-    return MappedTensorSchema(SparseTensorSchema(**kwargs), to_dense)
 
+    def _get_tensor_factory(
+        self, coords: np.ndarray, shape: Sequence[int]
+    ) -> Callable[[np.ndarray], np.ndarray]:
+        sum_duplicates = self._array.schema.allows_duplicates
+        return dense_array_factory(coords, shape, sum_duplicates)
 
-@singledispatch
-def to_dense(sa: Any) -> np.ndarray:
-    """Create a Numpy array from a sparse array"""
-    raise NotImplementedError
 
+def dense_array_factory(
+    coords: np.ndarray, shape: Sequence[int], sum_duplicates: bool = False
+) -> Callable[[np.ndarray], np.ndarray]:
+    """Return a function for creating Numpy arrays with the given non-zero coordinates.
 
-to_dense.register(sparse.COO)(methodcaller("todense"))  # type: ignore
-to_dense.register(scipy.sparse.csr_matrix)(methodcaller("toarray"))  # type: ignore
+    If `sum_duplicates` is true, the values of duplicate coordinates (if any) are
+    summed, otherwise the coordinates must be unique.
+    """
+    shape = tuple(shape)
+    index = tuple(coords)
+    if sum_duplicates:
+        # summing with np.add.at is much slower than assignment, so use it only if
+        # there are actually duplicate coordinates
+        sum_duplicates = not row_major_order(coords, shape)[1]
+
+    def factory(data: np.ndarray) -> np.ndarray:
+        dense = np.zeros(shape, dtype=data.dtype)
+        if sum_duplicates:
+            np.add.at(dense, index, data)
+        else:
+            dense[index] = data
+        return dense
+
+    return factory
@@ -1,6 +1,7 @@
 """Functionality for loading data from TileDB arrays to the PyTorch Dataloader API."""
 
 from functools import partial
+from itertools import chain
 from typing import Any, Callable, Iterator, Sequence, Tuple, Union
 
 import numpy as np
@@ -40,7 +41,18 @@ def PyTorchTileDBDataLoader(
     Users should NOT pass (TileDB-ML either doesn't support or implements internally the corresponding functionality)
     the following arguments: 'shuffle', 'sampler', 'batch_sampler', 'worker_init_fn' and 'collate_fn'.
     """
-    is_batched = kwargs.get("batch_size", 1) is not None
+    batch_size = kwargs.get("batch_size", 1)
+    is_batched = batch_size is not None
+    if is_batched and (
+        not isinstance(batch_size, int)
+        or isinstance(batch_size, bool)
+        or batch_size <= 0
+    ):
+        # same check as torch.utils.data.BatchSampler
+        raise ValueError(
+            "batch_size should be a positive integer value, "
+            f"but got batch_size={batch_size}"
+        )
 
     schemas = []
     map_fns = []
@@ -59,10 +71,31 @@ def PyTorchTileDBDataLoader(
     if not all(key_range.equal_values(schema.key_range) for schema in schemas[1:]):
         raise ValueError(f"All arrays must have the same key range: {key_range}")
 
+    num_workers = kwargs.get("num_workers", 0)
+    collator = Collator.from_schemas(*schemas)
+    if (
+        is_batched
+        and not num_workers
+        and not shuffle_buffer_size
+        and not any(map_fns)
+        and all(schema.kind is TensorKind.DENSE for schema in schemas)
+    ):
+        # slice the dense arrays into batches instead of unbatching them into rows
+        # and stacking the rows back into batches
+        kwargs.pop("batch_size", None)
+        datapipe = _get_batched_datapipe(
+            key_range,
+            schemas,
+            batch_size=batch_size,
+            drop_last=kwargs.pop("drop_last", False),
+        )
+        return DataLoader(
+            datapipe, batch_size=None, collate_fn=collator.convert, **kwargs
+        )
+
     datapipe_for_key_range = partial(
         _get_unbatched_datapipe, schemas=schemas, map_fns=map_fns
     )
-    num_workers = kwargs.get("num_workers", 0)
     if num_workers:
         if torchdata.__version__ < "0.4":
             raise NotImplementedError("torchdata>=0.4 required for multiple workers")
@@ -86,8 +119,7 @@ def PyTorchTileDBDataLoader(
         # shuffle the datapipe items
         datapipe = datapipe.shuffle(buffer_size=shuffle_buffer_size)
 
-    # construct an appropriate collate function
-    collator = Collator.from_schemas(*schemas)
+    # set the appropriate collate function
     kwargs["collate_fn"] = collator.collate if is_batched else collator.convert
 
     # return the DataLoader for the final datapipe
@@ -145,8 +177,82 @@ def _unbatch_tensors(
     batches = schema.iter_tensors(
         key_range.partition_by_weight(schema.max_partition_weight)
     )
-    if schema.num_fields > 1:
-        # convert batches of columns to batches of rows
-        batches = (zip(*batch) for batch in batches)
-    # flatten batches of rows
-    return (row for batch in batches for row in batch)
+    if schema.num_fields == 1:
+        # flatten batches of rows
+        return chain.from_iterable(batches)
+    # convert batches of columns to batches of rows and flatten them
+    return chain.from_iterable(zip(*batch) for batch in batches)
+
+
+def _get_batched_datapipe(
+    key_range: InclusiveRange[Any, int],
+    schemas: Sequence[TensorSchema[np.ndarray]],
+    batch_size: int,
+    drop_last: bool,
+) -> IterDataPipe[Union[TensorLikeOrTuple, Tuple[TensorLikeOrTuple, ...]]]:
+    """Return a datapipe over batches of rows for the given dense schemas and key range.
+
+    The items of the datapipe have the same structure as those of the datapipe returned
+    by `_get_unbatched_datapipe` but each `TensorLike` is a batch of `batch_size` rows.
+    """
+    schema_dps = [
+        DeferredIterableIterDataPipe(
+            _rebatch_tensors, schema, key_range, batch_size, drop_last
+        )
+        for schema in schemas
+    ]
+    dp = schema_dps.pop(0)
+    if schema_dps:
+        dp = dp.zip(*schema_dps)
+    return dp
+
+
+def _rebatch_tensors(
+    schema: TensorSchema[np.ndarray],
+    key_range: InclusiveRange[Any, int],
+    batch_size: int,
+    drop_last: bool,
+) -> Iterator[Union[np.ndarray, Sequence[np.ndarray]]]:
+    """
+    Generate batches of Numpy arrays for the given dense schema and key range and then
+    slice them into batches of `batch_size` rows.
+    The arrays are sliced without copying, except for the rows of batches that straddle
+    two generated batches, which have to be concatenated, and for non-contiguous slices
+    (e.g. if `key_dim_index > 0`), which are copied so that every batch is contiguous.
+    If `schema.num_fields == 1`, each batch is a single Numpy array
+    If `schema.num_fields > 1`, each batch is a sequence of Numpy arrays
+    """
+    single_field = schema.num_fields == 1
+    batches = schema.iter_tensors(
+        key_range.partition_by_weight(schema.max_partition_weight)
+    )
+    remainder: Sequence[np.ndarray] = ()
+    for batch in batches:
+        arrays = (batch,) if single_field else batch
+        num_rows = len(arrays[0])
+        start = 0
+        if remainder:
+            # complete the remainder of the previous read batch
+            start = min(batch_size - len(remainder[0]), num_rows)
+            remainder = tuple(
+                np.concatenate((r, a[:start])) for r, a in zip(remainder, arrays)
+            )
+            if len(remainder[0]) < batch_size:
+                continue
+            yield remainder[0] if single_field else remainder
+        stop = start + (num_rows - start) // batch_size * batch_size
+        batch_slices = map(
+            slice,
+            range(start, stop, batch_size),
+            range(start + batch_size, stop + 1, batch_size),
+        )
+        if single_field:
+            batch_arrays = map(arrays[0].__getitem__, batch_slices)
+            yield from map(np.ascontiguousarray, batch_arrays)
+        else:
+            for batch_slice in batch_slices:
+                yield tuple(np.ascontiguousarray(a[batch_slice]) for a in arrays)
+        remainder = tuple(a[stop:] for a in arrays) if stop < num_rows else ()
+    if remainder and not drop_last:
+        remainder = tuple(map(np.ascontiguousarray, remainder))
+        yield remainder[0] if single_field else remainder
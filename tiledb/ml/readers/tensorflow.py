@@ -1,14 +1,14 @@
 """Functionality for loading data from TileDB arrays to the Tensorflow Data API."""
 
-from functools import singledispatch
-from typing import Sequence, Union
+from typing import Callable, Sequence, Union
 
 import numpy as np
-import scipy.sparse
 import sparse
 import tensorflow as tf
 
-from ._tensor_schema import MappedTensorSchema, RaggedArray, SparseArray, TensorSchema
+from ._tensor_schema import MappedTensorSchema, RaggedArray, TensorSchema
+from ._tensor_schema.base_sparse import BaseCOOTensorSchema
+from ._tensor_schema.sparse import row_major_order
 from .types import ArrayParams, TensorKind
 
 Tensor = Union[np.ndarray, tf.SparseTensor]
@@ -27,11 +27,11 @@ def TensorflowTileDBDataset(
     """
     schemas = []
     for array_params in all_array_params:
-        schema = array_params.tensor_schema
+        schema = array_params.get_tensor_schema(
+            {TensorKind.SPARSE_COO: _SparseTensorSchema}
+        )
         if schema.kind is TensorKind.SPARSE_CSR:
             raise NotImplementedError(f"{schema.kind} tensors not supported")
-        elif schema.kind is TensorKind.SPARSE_COO:
-            schema = MappedTensorSchema(schema, _to_sparse_tensor)
         elif schema.kind is TensorKind.RAGGED:
             schema = MappedTensorSchema(schema, _to_ragged_tensor)
         schemas.append(schema)
@@ -83,21 +83,35 @@ def _get_tensor_specs(
     return specs if len(specs) > 1 else specs[0]
 
 
-@singledispatch
-def _to_sparse_tensor(sa: SparseArray) -> tf.SparseTensor:
-    """Create a tf.SparseTensor from a sparse array"""
-    raise NotImplementedError
+class _SparseTensorSchema(BaseCOOTensorSchema[tf.SparseTensor]):
+    """
+    TensorSchema for reading sparse TileDB arrays as tf.SparseTensor instances.
+
+    The tensors are created directly from the COO coordinates, without an intermediate
+    scipy.sparse.csr_matrix or sparse.COO array.
+    """
+
+    def _get_tensor_factory(
+        self, coords: np.ndarray, shape: Sequence[int]
+    ) -> Callable[[np.ndarray], tf.SparseTensor]:
+        shape = tuple(shape)
+        order, unique = row_major_order(coords, shape)
+        if not unique:
+            # let sparse.COO sum the values of duplicate coordinates
+            return lambda data: _coo_to_sparse_tensor(sparse.COO(coords, data, shape))
+        if order is not None:
+            coords = coords[:, order]
+        # tf.SparseTensor indices have shape (nnz, ndim)
+        indices = np.ascontiguousarray(coords.T)
 
+        def factory(data: np.ndarray) -> tf.SparseTensor:
+            if order is not None:
+                data = data[order]
+            return tf.SparseTensor(indices, data, shape)
 
-@_to_sparse_tensor.register(scipy.sparse.csr_matrix)
-def _csr_to_sparse_tensor(csr: scipy.sparse.csr_matrix) -> tf.SparseTensor:
-    """Create a tf.SparseTensor from a scipy.sparse.csr_matrix instance"""
-    coo = csr.tocoo()
-    coords = np.array((coo.row, coo.col))
-    return tf.SparseTensor(coords.T, coo.data, coo.shape)
+        return factory
 
 
-@_to_sparse_tensor.register(sparse.COO)
 def _coo_to_sparse_tensor(coo: sparse.COO) -> tf.SparseTensor:
     """Create a tf.SparseTensor from a sparse.COO instance"""
     return tf.SparseTensor(coo.coords.T, coo.data, coo.shape)
@@ -10,6 +10,7 @@ if TYPE_CHECKING:
     from ._tensor_schema import TensorSchema
 
 Selector = Union[slice, Sequence[int]]
+TensorSchemaFactory = Callable[..., "TensorSchema[Any]"]
 
 
 class TensorKind(enum.Enum):
@@ -33,6 +34,8 @@ class ArrayParams:
         - **dim_selectors:** Mapping from dimension name to a slice or sequence of indices of this dimension to select.
         - **tensor_kind:** kind of tensor desired. If not specified, it is determined based on the array schema.
         - **fn:** Function being applied over each item.
+        - **buffer_bytes:** Maximum size in bytes of the buffers read from the array. If not specified, the largest partition that fits in the memory budget of the TileDB config (`sm.mem.total_budget` for dense and `py.init_buffer_bytes` for sparse arrays) is read. Note that if `prefetch` is true, up to two buffers are held in memory at the same time.
+        - **prefetch:** If true (default), read the next partition of the array in a background thread while the current one is being processed. This overlaps reading with processing at the cost of holding up to two partitions (i.e. twice the memory budget) in memory, so it is done only if the memory budget of a partition is at most 200MB.
     """
 
     array: tiledb.Array
@@ -41,9 +44,15 @@ class ArrayParams:
     dim_selectors: Mapping[str, Selector] = field(default_factory=dict)
     tensor_kind: Optional[TensorKind] = None
     fn: Optional[Callable] = None
+    buffer_bytes: Optional[int] = None
+    prefetch: bool = True
     _tensor_schema_kwargs: Mapping[str, Any] = field(init=False, repr=False)
 
     def __post_init__(self) -> None:
+        if self.buffer_bytes is not None and self.buffer_bytes <= 0:
+            raise ValueError(
+                f"buffer_bytes must be positive, got buffer_bytes={self.buffer_bytes}"
+            )
         all_attrs = [self.array.attr(i).name for i in range(self.array.nattr)]
         all_dims = [self.array.dim(i).name for i in range(self.array.ndim)]
         dims = []
@@ -113,14 +122,30 @@ class ArrayParams:
             _ned=tuple(ned),
             _dim_selectors=dim_selector_indices,
             _query_kwargs={"attrs": tuple(attrs), "dims": tuple(dims)},
+            _buffer_bytes=self.buffer_bytes,
+            _prefetch=self.prefetch,
         )
         object.__setattr__(self, "_tensor_schema_kwargs", tensor_schema_kwargs)
 
     @property
     def tensor_schema(self) -> "TensorSchema[Any]":
+        return self.get_tensor_schema()
+
+    def get_tensor_schema(
+        self, factories: Optional[Mapping[TensorKind, TensorSchemaFactory]] = None
+    ) -> "TensorSchema[Any]":
+        """Create a TensorSchema for this array.
+
+        :param factories: Mapping from tensor kind to the TensorSchema factory to use
+            instead of the default one for this kind.
+        """
         # local import to avoid cyclic import
         from ._tensor_schema import TensorSchemaFactories
 
         kwargs = self._tensor_schema_kwargs
-        factory = TensorSchemaFactories[self.array.schema.sparse, kwargs["kind"]]
-        return factory(**kwargs)
+        kind = kwargs["kind"]
+        factory = (factories or {}).get(kind)
+        if factory is None:
+            factory = TensorSchemaFactories[self.array.schema.sparse, kind]
+        # every schema gets its own query kwargs since it may update them
+        return factory(**dict(kwargs, _query_kwargs=dict(kwargs["_query_kwargs"])))